@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
-from gtts import gTTS
-import tempfile
 import os
 from io import BytesIO
+from audio_delivery import answer_audio
 
 # -------------------------------
 # Load Dataset
@@ -85,10 +84,8 @@ if submitted and user_question:
     # -------------------------------
     try:
         if selected_lang in ["English", "Hindi"]:
-            tts = gTTS(text=short_answer, lang="hi" if selected_lang=="Hindi" else "en")
-            with tempfile.NamedTemporaryFile(delete=True) as fp:
-                tts.save(f"{fp.name}.mp3")
-                st.audio(f"{fp.name}.mp3")
+            audio_bytes, audio_mime = answer_audio(short_answer, "hi" if selected_lang=="Hindi" else "en")
+            st.audio(audio_bytes, format=audio_mime)
     except Exception as e:
         st.warning(f"Audio playback not available: {e}")
 
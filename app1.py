@@ -1,12 +1,10 @@
 import streamlit as st
-import pandas as pd
-from gtts import gTTS
-import tempfile
 import os
 import speech_recognition as sr
-from rapidfuzz import process
 import csv
-from io import BytesIO
+from audio_delivery import answer_audio
+from dataset_index import match
+from knowledge_packs import KnowledgePackRegistry, PackNotFound
 
 # Optional: AI Enhancement
 try:
@@ -18,14 +16,15 @@ except:
     client = None
 
 # -------------------------------
-# Load Dataset
+# Knowledge Packs
 # -------------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_excel("SIH_Dataset_Final.xlsx")
-    return df
+# Shared across sessions; each (pack, language) pair is loaded on first use
+# and evicted under a memory budget (see knowledge_packs.py)
+@st.cache_resource
+def load_registry():
+    return KnowledgePackRegistry()
 
-df = load_data()
+registry = load_registry()
 
 # -------------------------------
 # Language mapping
@@ -60,16 +59,24 @@ st.markdown("---")
 # Language Selection
 # -------------------------------
 selected_lang = st.selectbox("🌐 Select language:", list(language_map.keys()))
+selected_pack = st.selectbox("📚 Knowledge pack:", registry.available())
 
 col_name = f"Query_{language_map[selected_lang]}"
-short_col = f"Short_{language_map[selected_lang]}"
-detailed_col = f"Detailed_{language_map[selected_lang]}"
+
+# Loads only the selected pack and language; None if the workbook or its columns are missing
+pack = registry.get(selected_pack, language_map[selected_lang])
+
+with st.sidebar:
+    with st.expander("Loaded knowledge packs"):
+        for name, lang, size in registry.resident():
+            st.caption(f"{name} / {lang}: {size / 1024 / 1024:.1f} MB")
+        st.caption(f"Total: {registry.resident_bytes() / 1024 / 1024:.1f} of {registry.budget / 1024 / 1024:.0f} MB")
 
 # -------------------------------
 # Example Queries
 # -------------------------------
-if col_name in df.columns:
-    example_queries = df[col_name].dropna().tolist()[:3]
+if pack is not None:
+    example_queries = pack.df[col_name].dropna().tolist()[:3]
     st.markdown("💡 **Try one of these example questions:**")
     cols = st.columns(len(example_queries))
     for i, query in enumerate(example_queries):
@@ -112,79 +119,100 @@ submitted = st.button("🔍 Get Answer") or (user_question and user_question.end
 # -------------------------------
 # Fetch Answer with Semantic/Fuzzy Match
 # -------------------------------
+# Matching and AI enhancement are cached, and the result is kept in session
+# state so the panels below can rerun on their own without recomputing it.
+@st.cache_data(show_spinner=False)
+def match_question(question, pack_name, lang):
+    short_col, detailed_col = f"Short_{language_map[lang]}", f"Detailed_{language_map[lang]}"
+    pack = registry.get(pack_name, language_map[lang])
+    if pack is None:  # raise so the miss isn't cached; the pack may be added later
+        raise PackNotFound(pack_name, lang)
+
+    best_match, score, idx = match(pack.index, question, processor=str.lower)
+
+    if score > 50 and idx is not None:  # threshold for fuzzy match
+        matched_row = pack.df.loc[idx]
+        return str(matched_row[short_col]), str(matched_row[detailed_col])
+    answer = "❌ Sorry, we couldn't find a close answer in our database."
+    return answer, answer
+
+
+@st.cache_data(show_spinner=False)
+def enhance_answer(question, detailed_answer):
+    prompt = f"""You are a legal assistant. Reframe and expand the following legal answer into a clear, helpful explanation for a citizen.
+    Question: {question}
+    Existing Answer: {detailed_answer}
+    """
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=300,
+        temperature=0.5
+    )
+    return response.choices[0].message.content.strip()
+
+
 if submitted and user_question:
-    short_answer, detailed_answer = "", ""
-
-    if col_name in df.columns:
-        question_list = df[col_name].dropna().str.lower().tolist()
-        best_match, score, idx = process.extractOne(user_question.lower(), question_list) if question_list else (None, 0, None)
-
-        if score > 50 and idx is not None:  # threshold for fuzzy match
-            matched_row = df.iloc[idx]
-            short_answer = str(matched_row[short_col])
-            detailed_answer = str(matched_row[detailed_col])
-        else:
-            short_answer = "❌ Sorry, we couldn't find a close answer in our database."
-            detailed_answer = short_answer
-    else:
-        short_answer = "⚠️ Dataset for this language not available."
-        detailed_answer = short_answer
+    try:
+        short_answer, detailed_answer = match_question(user_question, selected_pack, selected_lang)
+    except PackNotFound:
+        short_answer = detailed_answer = "⚠️ Dataset for this language not available."
 
     # -------------------------------
     # AI Enhancement (if available)
     # -------------------------------
     if client and detailed_answer not in ["", short_answer]:
         try:
-            prompt = f"""You are a legal assistant. Reframe and expand the following legal answer into a clear, helpful explanation for a citizen.
-            Question: {user_question}
-            Existing Answer: {detailed_answer}
-            """
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=300,
-                temperature=0.5
-            )
-            ai_answer = response.choices[0].message.content.strip()
-            detailed_answer = ai_answer
+            detailed_answer = enhance_answer(user_question, detailed_answer)
         except Exception as e:
             st.warning("⚠️ AI enhancement failed, showing dataset answer only.")
 
-    # -------------------------------
-    # Show Answers
-    # -------------------------------
+    st.session_state['answer'] = {
+        "question": user_question,
+        "lang": selected_lang,
+        "pack": selected_pack,
+        "short": short_answer,
+        "detailed": detailed_answer,
+    }
+    st.session_state['answer_audio'] = {}
+
+
+# -------------------------------
+# Show Answers
+# -------------------------------
+@st.fragment
+def answer_panel(answer):
     st.markdown("### 📖 Answers")
-    st.success(f"**Short Answer:**\n{short_answer}")
-    st.info(f"**Detailed Answer:**\n{detailed_answer}")
+    st.success(f"**Short Answer:**\n{answer['short']}")
+    st.info(f"**Detailed Answer:**\n{answer['detailed']}")
 
-    # -------------------------------
-    # Text-to-Speech for All Languages
-    # -------------------------------
-    tts_lang = tts_lang_map.get(selected_lang, "en")
+
+# -------------------------------
+# Text-to-Speech for All Languages
+# -------------------------------
+@st.fragment
+def audio_panel(answer):
+    tts_lang = tts_lang_map.get(answer['lang'], "en")
+    audio_cache = st.session_state.setdefault('answer_audio', {})
 
     col1, col2 = st.columns(2)
-    with col1:
-        if st.button("🔈 Play Short Answer"):
-            try:
-                tts = gTTS(text=short_answer, lang=tts_lang)
-                audio_fp = BytesIO()
-                tts.write_to_fp(audio_fp)
-                st.audio(audio_fp.getvalue(), format="audio/mp3")
-            except:
-                st.warning("Audio playback failed.")
-    with col2:
-        if st.button("🔉 Play Detailed Answer"):
-            try:
-                tts = gTTS(text=detailed_answer, lang=tts_lang)
-                audio_fp = BytesIO()
-                tts.write_to_fp(audio_fp)
-                st.audio(audio_fp.getvalue(), format="audio/mp3")
-            except:
-                st.warning("Audio playback failed.")
+    for col, which, label in ((col1, "short", "🔈 Play Short Answer"), (col2, "detailed", "🔉 Play Detailed Answer")):
+        with col:
+            if st.button(label, key=f"play_{which}") and which not in audio_cache:
+                try:
+                    audio_cache[which] = answer_audio(answer[which], tts_lang)
+                except:
+                    st.warning("Audio playback failed.")
+            if which in audio_cache:
+                audio_bytes, audio_mime = audio_cache[which]
+                st.audio(audio_bytes, format=audio_mime)
 
-    # -------------------------------
-    # Feedback Section
-    # -------------------------------
+
+# -------------------------------
+# Feedback Section
+# -------------------------------
+@st.fragment
+def feedback_panel(answer):
     st.markdown("### 📝 Feedback")
     feedback_type = st.radio("Was this answer helpful?", ["👍 Yes", "👎 No"])
     feedback_comment = ""
@@ -197,9 +225,16 @@ if submitted and user_question:
             writer = csv.writer(file)
             if not file_exists:
                 writer.writerow(["Question", "ShortAnswer", "DetailedAnswer", "FeedbackType", "Comment"])
-            writer.writerow([user_question, short_answer, detailed_answer, feedback_type, feedback_comment])
+            writer.writerow([answer['question'], answer['short'], answer['detailed'], feedback_type, feedback_comment])
         st.success("✅ Thanks for your response! We appreciate your feedback.")
 
+
+answer = st.session_state.get('answer')
+if answer and answer['lang'] == selected_lang and answer['pack'] == selected_pack:
+    answer_panel(answer)
+    audio_panel(answer)
+    feedback_panel(answer)
+
 # -------------------------------
 # Footer
 # -------------------------------
@@ -0,0 +1,138 @@
+import hashlib
+import shutil
+import subprocess
+from io import BytesIO
+
+import streamlit as st
+from gtts import gTTS
+
+# -------------------------------
+# Audio formats
+# -------------------------------
+# gTTS always returns a 24 kHz mp3. For rural 2G/3G users we re-encode that
+# once into a compact speech variant; the browser gets whichever one it can play.
+AUDIO_FORMATS = {
+    # Opus in an OGG container: smallest, played by Chrome/Firefox/Android.
+    "opus": {
+        "mime": "audio/ogg",
+        "ffmpeg_args": ["-ac", "1", "-c:a", "libopus", "-b:a", "12k",
+                        "-application", "voip", "-f", "ogg"],
+    },
+    # Mono, 16 kHz, low-bitrate mp3 for browsers without Opus (older Safari/iOS).
+    "mp3_speech": {
+        "mime": "audio/mpeg",
+        "ffmpeg_args": ["-ac", "1", "-ar", "16000", "-c:a", "libmp3lame",
+                        "-b:a", "16k", "-f", "mp3"],
+    },
+    # Untouched gTTS output.
+    "mp3": {
+        "mime": "audio/mpeg",
+        "ffmpeg_args": None,
+    },
+}
+
+DEFAULT_FORMAT = "opus"
+
+
+def content_hash(data):
+    """Returns a stable hex digest used as the cache key for audio blobs."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+# -------------------------------
+# Synthesis (one gTTS call per unique text)
+# -------------------------------
+@st.cache_data(max_entries=256, show_spinner=False)
+def _synthesize(text_hash, lang, _text):
+    tts = gTTS(text=_text, lang=lang)
+    audio_fp = BytesIO()
+    tts.write_to_fp(audio_fp)
+    return audio_fp.getvalue()
+
+
+def synthesize(text, lang):
+    """Returns gTTS mp3 bytes for `text`, cached by content hash of the text."""
+    return _synthesize(content_hash(f"{lang}:{text}"), lang, text)
+
+
+# -------------------------------
+# Transcoding (one ffmpeg call per unique audio + format)
+# -------------------------------
+class TranscodeError(Exception):
+    """Raised when ffmpeg is unavailable or fails to encode a clip."""
+
+
+# Failures raise instead of returning, so st.cache_data never caches them
+# and the next request for the same clip tries again.
+@st.cache_data(max_entries=512, show_spinner=False)
+def _transcode(audio_hash, fmt, _mp3_bytes):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise TranscodeError("ffmpeg not found")
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+             *AUDIO_FORMATS[fmt]["ffmpeg_args"], "pipe:1"],
+            input=_mp3_bytes,
+            capture_output=True,
+            timeout=30,
+        )
+    except (subprocess.TimeoutExpired, OSError) as e:
+        raise TranscodeError(str(e)) from e
+    if result.returncode != 0 or not result.stdout:
+        raise TranscodeError(result.stderr.decode("utf-8", "replace").strip() or "empty output")
+    return result.stdout
+
+
+def transcode(mp3_bytes, fmt):
+    """Re-encodes mp3 bytes into `fmt`. Returns (audio_bytes, mime).
+
+    Falls back to the original mp3 if ffmpeg is missing or the encode fails,
+    or if the "compact" variant turns out larger than the source.
+    """
+    original = mp3_bytes, AUDIO_FORMATS["mp3"]["mime"]
+    if AUDIO_FORMATS.get(fmt, {}).get("ffmpeg_args") is None:
+        return original
+    try:
+        encoded = _transcode(content_hash(mp3_bytes), fmt, mp3_bytes)
+    except TranscodeError:
+        return original
+    if len(encoded) >= len(mp3_bytes):
+        return original
+    return encoded, AUDIO_FORMATS[fmt]["mime"]
+
+
+# -------------------------------
+# Per-client format selection
+# -------------------------------
+def client_headers():
+    """Returns the request headers of the current session, or {} if unavailable."""
+    try:
+        return {k.lower(): v for k, v in st.context.headers.items()}
+    except Exception:
+        return {}
+
+
+def pick_format(headers=None):
+    """Chooses the audio format for the client that sent `headers`."""
+    headers = client_headers() if headers is None else {k.lower(): v for k, v in headers.items()}
+    user_agent = headers.get("user-agent", "")
+
+    # Safari (macOS < 14 / iOS < 17) can't reliably play OGG/Opus. Every iOS
+    # browser (incl. Chrome "CriOS" and Firefox "FxiOS") is WebKit underneath.
+    # Desktop Chrome/Firefox UAs also contain "Safari", so rule them out.
+    is_ios = any(token in user_agent for token in ("iPhone", "iPad", "iPod"))
+    is_safari = "Safari" in user_agent and not any(
+        token in user_agent for token in ("Chrome", "Chromium", "Android", "Firefox")
+    )
+    if is_ios or is_safari:
+        return "mp3_speech"
+    return DEFAULT_FORMAT
+
+
+def answer_audio(text, lang, fmt=None):
+    """Synthesizes (or reuses) speech for `text` and returns (audio_bytes, mime) for the client."""
+    mp3_bytes = synthesize(text, lang)
+    return transcode(mp3_bytes, fmt or pick_format())
@@ -0,0 +1,234 @@
+import os
+import pickle
+import random
+import sys
+import tempfile
+import zlib
+from collections import defaultdict
+
+import pandas as pd
+from rapidfuzz import process
+
+LANGUAGES = ["English", "Hindi", "Bengali", "Marathi", "Tamil", "Telugu"]
+
+# -------------------------------
+# MinHash / LSH settings
+# -------------------------------
+SHINGLE_SIZE = 3         # character shingles
+NUM_PERM = 64            # MinHash signature length
+BANDS = 16               # LSH bands (NUM_PERM / BANDS rows per band)
+SIMILARITY = 0.6         # min. estimated Jaccard to merge two questions
+EXPAND_TOP = 3           # clusters expanded per query
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(2024)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _shingles(text):
+    text = " ".join(str(text).lower().split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """Returns the MinHash signature of the character shingles of `text`."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in _shingles(text)]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _similarity(sig1, sig2):
+    return sum(x == y for x, y in zip(sig1, sig2)) / NUM_PERM
+
+
+# -------------------------------
+# Compilation
+# -------------------------------
+def compile_language(df, lang):
+    """Clusters near-duplicate questions of one language.
+
+    Two questions are merged only if they point to identical Short_/Detailed_
+    answers and their estimated Jaccard similarity is at least SIMILARITY, so
+    any member of a cluster yields the same answer. Returns a dict with the
+    canonical questions ("representatives"), the df row labels of every
+    cluster ("clusters") and the original/compiled sizes, or None if the
+    language is missing from the dataset.
+    """
+    col_name, short_col, detailed_col = (f"{prefix}_{lang}" for prefix in ("Query", "Short", "Detailed"))
+    if col_name not in df.columns:
+        return None
+
+    rows = df[col_name].dropna()
+    labels = list(rows.index)
+    questions = [str(q) for q in rows]
+    answers = [
+        (str(df.at[label, short_col]) if short_col in df.columns else "",
+         str(df.at[label, detailed_col]) if detailed_col in df.columns else "")
+        for label in labels
+    ]
+    signatures = [minhash(q) for q in questions]
+
+    # Union-find over LSH candidate pairs
+    parent = list(range(len(questions)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows_per_band = NUM_PERM // BANDS
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        for i, sig in enumerate(signatures):
+            buckets[sig[band * rows_per_band:(band + 1) * rows_per_band]].append(i)
+        for bucket in buckets.values():
+            for pos, j in enumerate(bucket):
+                for i in bucket[:pos]:
+                    if find(i) != find(j) and answers[i] == answers[j] \
+                            and _similarity(signatures[i], signatures[j]) >= SIMILARITY:
+                        parent[find(j)] = find(i)
+
+    members = defaultdict(list)
+    for i in range(len(questions)):
+        members[find(i)].append(i)
+
+    representatives, clusters, variants = [], [], []
+    for root in sorted(members):
+        group = members[root]
+        # Canonical question: the member closest to all the others
+        canonical = max(group, key=lambda i: sum(_similarity(signatures[i], signatures[j]) for j in group))
+        representatives.append(questions[canonical])
+        clusters.append([labels[i] for i in group])
+        variants.append([questions[i] for i in group])
+
+    return {
+        "representatives": representatives,
+        "clusters": clusters,
+        "variants": variants,
+        "questions": len(questions),
+    }
+
+
+def compile_dataset(df):
+    """Compiles the clustered index for every language in LANGUAGES."""
+    return {lang: compile_language(df, lang) for lang in LANGUAGES}
+
+
+# Bump when the layout of the compiled index changes
+INDEX_FORMAT = 1
+
+
+def index_params():
+    """Everything a compiled index depends on besides the data itself."""
+    return (INDEX_FORMAT, SHINGLE_SIZE, NUM_PERM, BANDS, SIMILARITY)
+
+
+def index_path(dataset_path, lang=None):
+    base = os.path.splitext(dataset_path)[0]
+    return f"{base}.{lang}.index.pkl" if lang else f"{base}.index.pkl"
+
+
+def save_index(path, index):
+    """Pickles `index` to `path` atomically.
+
+    Sessions share the registry and may compile the same index at once, so
+    each writes a temp file in the same directory and renames it into place;
+    readers never see a half-written pickle.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump({"params": index_params(), "index": index}, file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_index(path, dataset_path):
+    """Returns the index pickled at `path`, or None if it's missing, older than
+    `dataset_path` or was compiled with different parameters."""
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(dataset_path):
+        return None
+    try:
+        with open(path, "rb") as file:
+            cached = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if not isinstance(cached, dict) or cached.get("params") != index_params():
+        return None
+    return cached["index"]
+
+
+def load_index(dataset_path, df):
+    """Loads the compiled index next to `dataset_path`, recompiling it if stale."""
+    path = index_path(dataset_path)
+    index = read_index(path, dataset_path)
+    if index is not None:
+        return index
+    index = compile_dataset(df)
+    try:
+        save_index(path, index)
+    except OSError:
+        pass  # read-only deployments just keep the in-memory index
+    return index
+
+
+def load_language_index(dataset_path, df, lang):
+    """Like load_index(), but for a single language, cached in its own pickle."""
+    path = index_path(dataset_path, lang)
+    lang_index = read_index(path, dataset_path)
+    if lang_index is not None:
+        return lang_index
+    lang_index = compile_language(df, lang)
+    try:
+        save_index(path, lang_index)
+    except OSError:
+        pass
+    return lang_index
+
+
+# -------------------------------
+# Matching
+# -------------------------------
+def match(lang_index, question, processor=None, **kwargs):
+    """Finds the best matching question using the compiled index.
+
+    Scores the cluster representatives first, then expands only the EXPAND_TOP
+    best clusters and scores their variants. Extra keyword arguments (e.g.
+    `scorer`) are passed to rapidfuzz. Returns (question, score, row_label),
+    or (None, 0, None) if the index is empty.
+    """
+    if not lang_index or not lang_index["representatives"]:
+        return None, 0, None
+
+    best = (None, 0, None)
+    top = process.extract(question, lang_index["representatives"], processor=processor, limit=EXPAND_TOP, **kwargs)
+    for _, _, cluster in top:
+        result = process.extractOne(question, lang_index["variants"][cluster], processor=processor, **kwargs)
+        if result and result[1] > best[1]:
+            best = (result[0], result[1], lang_index["clusters"][cluster][result[2]])
+    return best
+
+
+def index_report(index):
+    """Returns a per-language summary of how much the clustering shrank the search space."""
+    lines = []
+    for lang, lang_index in index.items():
+        if lang_index is None:
+            lines.append(f"{lang}: not in dataset")
+            continue
+        total, compiled = lang_index["questions"], len(lang_index["representatives"])
+        saved = 100 * (1 - compiled / total) if total else 0
+        lines.append(f"{lang}: {total} questions -> {compiled} clusters ({saved:.1f}% smaller)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    dataset_path = sys.argv[1] if len(sys.argv) > 1 else "SIH_Dataset_Final.xlsx"
+    index = compile_dataset(pd.read_excel(dataset_path))
+    save_index(index_path(dataset_path), index)
+    print(index_report(index))
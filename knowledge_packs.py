@@ -0,0 +1,145 @@
+import glob
+import math
+import os
+import sys
+import threading
+import warnings
+from collections import OrderedDict
+
+import pandas as pd
+
+from dataset_index import load_language_index
+
+# -------------------------------
+# Pack discovery
+# -------------------------------
+# "core" is the original all-India dataset. State- and domain-specific packs
+# (labour, tenancy, consumer, ...) are workbooks with the same
+# Query_/Short_/Detailed_<Language> columns dropped into PACKS_DIR.
+CORE_PACK = "core"
+CORE_DATASET = "SIH_Dataset_Final.xlsx"
+PACKS_DIR = "packs"
+
+# Memory budget for resident packs, in MB (override with NYAYASETU_PACK_BUDGET_MB)
+DEFAULT_BUDGET_MB = 256
+
+
+def budget_from_env():
+    """Reads NYAYASETU_PACK_BUDGET_MB, falling back to DEFAULT_BUDGET_MB if it isn't a positive, finite number."""
+    value = os.getenv("NYAYASETU_PACK_BUDGET_MB")
+    if value is None:
+        return DEFAULT_BUDGET_MB
+    try:
+        budget_mb = float(value)
+    except ValueError:
+        budget_mb = 0
+    if not (math.isfinite(budget_mb) and budget_mb > 0):
+        warnings.warn(f"Invalid NYAYASETU_PACK_BUDGET_MB={value!r}, using {DEFAULT_BUDGET_MB} MB")
+        return DEFAULT_BUDGET_MB
+    return budget_mb
+
+
+def discover_packs(packs_dir=PACKS_DIR):
+    """Returns {pack name: workbook path} for the core dataset and every workbook in `packs_dir`."""
+    packs = {CORE_PACK: CORE_DATASET}
+    for path in sorted(glob.glob(os.path.join(packs_dir, "*.xlsx"))):
+        packs[os.path.splitext(os.path.basename(path))[0]] = path
+    return packs
+
+
+def _index_size(lang_index):
+    size = sys.getsizeof(lang_index)
+    for key in ("representatives", "clusters", "variants"):
+        items = lang_index[key]
+        size += sys.getsizeof(items)
+        for item in items:
+            size += sys.getsizeof(item)
+            if isinstance(item, list):
+                size += sum(sys.getsizeof(x) for x in item)
+    return size
+
+
+class PackNotFound(LookupError):
+    """Raised when a (pack, language) pair has no workbook or no columns for the language."""
+
+
+class KnowledgePack:
+    """The rows and compiled question index of one (pack, language) pair."""
+
+    def __init__(self, name, lang, df, index):
+        self.name = name
+        self.lang = lang
+        self.df = df
+        self.index = index
+        self.size = int(df.memory_usage(deep=True).sum()) + _index_size(index)
+
+
+class KnowledgePackRegistry:
+    """Loads (pack, language) pairs lazily and keeps them under a memory budget.
+
+    Each pair is read from its workbook (only that language's columns) on first
+    use. Its question index comes from a per-language pickle next to the
+    workbook, so reloading an evicted pack doesn't recompile it. When the
+    resident packs exceed `budget_mb`, the least recently used ones are
+    evicted; the pack just requested always stays.
+    """
+
+    def __init__(self, packs=None, budget_mb=None):
+        self.packs = discover_packs() if packs is None else dict(packs)
+        if budget_mb is None:
+            budget_mb = budget_from_env()
+        self.budget = int(budget_mb * 1024 * 1024)
+        self._resident = OrderedDict()
+        self._lock = threading.Lock()
+
+    def available(self):
+        return list(self.packs)
+
+    def get(self, pack, lang):
+        """Returns the KnowledgePack for (pack, lang), loading it if needed.
+
+        Returns None if the pack doesn't exist or has no columns for `lang`.
+        """
+        key = (pack, lang)
+        with self._lock:
+            if key in self._resident:
+                self._resident.move_to_end(key)
+                return self._resident[key]
+
+        loaded = self._load(pack, lang)
+        if loaded is None:
+            return None
+
+        with self._lock:
+            self._resident[key] = loaded
+            self._resident.move_to_end(key)
+            while self._resident_bytes_locked() > self.budget and len(self._resident) > 1:
+                self._resident.popitem(last=False)
+        return loaded
+
+    def _load(self, pack, lang):
+        path = self.packs.get(pack)
+        if path is None or not os.path.exists(path):
+            return None
+
+        columns = {f"{prefix}_{lang}" for prefix in ("Query", "Short", "Detailed")}
+        df = pd.read_excel(path, usecols=lambda column: column in columns)
+        if len(df.columns) != len(columns):
+            return None
+        return KnowledgePack(pack, lang, df, load_language_index(path, df, lang))
+
+    def evict(self, pack, lang):
+        with self._lock:
+            self._resident.pop((pack, lang), None)
+
+    def resident(self):
+        """Returns [(pack, lang, size in bytes)] from least to most recently used."""
+        with self._lock:
+            return [(p.name, p.lang, p.size) for p in self._resident.values()]
+
+    def resident_bytes(self):
+        with self._lock:
+            return self._resident_bytes_locked()
+
+    def _resident_bytes_locked(self):
+        return sum(p.size for p in self._resident.values())
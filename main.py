@@ -5,30 +5,24 @@
 
 
 import streamlit as st
-import pandas as pd
-from gtts import gTTS
-import tempfile
-import os
 import speech_recognition as sr
-from rapidfuzz import process, fuzz
+from rapidfuzz import fuzz
+from audio_delivery import answer_audio
+from dataset_index import match
+from knowledge_packs import KnowledgePackRegistry, PackNotFound
 
 # Set up page configuration for a wider layout
 st.set_page_config(layout="wide")
 
 # -------------------------------
-# Load Dataset
+# Knowledge Packs
 # -------------------------------
-@st.cache_data
-def load_data():
-    """Loads the dataset from an Excel file and caches it."""
-    try:
-        df = pd.read_excel("SIH_Dataset_Final.xlsx")
-        return df
-    except FileNotFoundError:
-        st.error("Error: 'SIH_Dataset_Final.xlsx' not found. Please ensure the file is in the same directory.")
-        st.stop()
+@st.cache_resource
+def load_registry():
+    """Shared across sessions; each (pack, language) pair is loaded on first use (see knowledge_packs.py)."""
+    return KnowledgePackRegistry()
 
-df = load_data()
+registry = load_registry()
 
 # -------------------------------
 # Language mapping
@@ -59,17 +53,24 @@ st.markdown("---")
 with st.sidebar:
     st.header("Settings")
     selected_lang = st.selectbox("Select language:", list(language_map.keys()))
+    selected_pack = st.selectbox("Knowledge pack:", registry.available())
     st.info("Your feedback helps us improve!")
 
 # Map selected language to column names
 col_name = f"Query_{language_map[selected_lang]}"
-short_col = f"Short_{language_map[selected_lang]}"
-detailed_col = f"Detailed_{language_map[selected_lang]}"
 
-# Check if required columns exist in the dataframe
-if col_name not in df.columns or short_col not in df.columns or detailed_col not in df.columns:
-    st.error(f"Error: Required columns for '{selected_lang}' language are not present in the dataset.")
+# Load only the selected pack and language; returns None if the workbook or its columns are missing
+pack = registry.get(selected_pack, language_map[selected_lang])
+if pack is None:
+    st.error(f"Error: The '{selected_pack}' knowledge pack is missing or has no data for '{selected_lang}'.")
     st.stop()
+df = pack.df
+
+with st.sidebar:
+    with st.expander("Loaded knowledge packs"):
+        for name, lang, size in registry.resident():
+            st.caption(f"{name} / {lang}: {size / 1024 / 1024:.1f} MB")
+        st.caption(f"Total: {registry.resident_bytes() / 1024 / 1024:.1f} of {registry.budget / 1024 / 1024:.0f} MB")
 
 # -------------------------------
 # Main Content Area
@@ -80,103 +81,135 @@ st.markdown("---")
 # -------------------------------
 # Example Queries
 # -------------------------------
+def set_question(question):
+    """Button callback: sets the question before the rerun, so no extra st.rerun() is needed."""
+    st.session_state['user_question'] = question
+    st.session_state['user_question_input'] = question
+
+
 st.markdown("**Try one of these example questions:**")
 example_queries = df[col_name].dropna().tolist()[:3]
 cols = st.columns(len(example_queries))
 for i, query in enumerate(example_queries):
     with cols[i]:
-        if st.button(query):
-            st.session_state['user_question'] = query
-            st.rerun()
+        st.button(query, on_click=set_question, args=(query,))
 
 # -------------------------------
 # User Input & Speech Recognition
 # -------------------------------
-user_input_col, speech_col = st.columns([4, 1])
-
-with user_input_col:
-    user_question = st.text_input("Enter your question:", value=st.session_state['user_question'], key='user_question_input')
-
-with speech_col:
-    st.markdown("<br>", unsafe_allow_html=True) # Add some spacing
-    if st.button("🎙️ Speak"):
-        st.session_state['is_listening'] = True
-
-if st.session_state.get('is_listening'):
+def listen():
+    """Button callback: records a question from the microphone before the rerun."""
     r = sr.Recognizer()
     try:
         with st.spinner("Listening... Please speak clearly."):
             with sr.Microphone() as source:
                 r.adjust_for_ambient_noise(source)
                 audio = r.listen(source, timeout=5, phrase_time_limit=5)
-            
-            lang_code = "hi-IN" if selected_lang == "Hindi" else "en-IN"
-            user_question_speech = r.recognize_google(audio, language=lang_code)
-            st.session_state['user_question'] = user_question_speech
-            st.session_state['is_listening'] = False
-            st.rerun()
-            
+
+        lang_code = "hi-IN" if selected_lang == "Hindi" else "en-IN"
+        set_question(r.recognize_google(audio, language=lang_code))
     except sr.UnknownValueError:
-        st.warning("Sorry, I could not understand the audio. Please try again.")
-        st.session_state['is_listening'] = False
+        st.session_state['speech_error'] = ("warning", "Sorry, I could not understand the audio. Please try again.")
     except sr.RequestError as e:
-        st.error(f"Could not request results from the speech recognition service; {e}")
-        st.session_state['is_listening'] = False
+        st.session_state['speech_error'] = ("error", f"Could not request results from the speech recognition service; {e}")
     except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
-        st.session_state['is_listening'] = False
+        st.session_state['speech_error'] = ("error", f"An unexpected error occurred: {e}")
+
+
+user_input_col, speech_col = st.columns([4, 1])
+
+with user_input_col:
+    user_question = st.text_input("Enter your question:", key='user_question_input')
+    st.session_state['user_question'] = user_question
+
+with speech_col:
+    st.markdown("<br>", unsafe_allow_html=True) # Add some spacing
+    st.button("🎙️ Speak", on_click=listen)
+
+if 'speech_error' in st.session_state:
+    level, message = st.session_state.pop('speech_error')
+    getattr(st, level)(message)
 
 # -------------------------------
 # Fetch Answer
 # -------------------------------
+# The match is cached and stored in session state; the answer, audio and
+# feedback panels are fragments, so clicking inside one reruns only that panel.
+@st.cache_data(show_spinner=False)
+def match_question(question, pack_name, lang):
+    short_col, detailed_col = f"Short_{language_map[lang]}", f"Detailed_{language_map[lang]}"
+    pack = registry.get(pack_name, language_map[lang])
+    if pack is None:  # workbook removed since the page was rendered; raise so the miss isn't cached
+        raise PackNotFound(pack_name, lang)
+
+    # Use fuzzy matching with a threshold, scoring cluster representatives first
+    best_match, score, index = match(
+        pack.index,
+        question,
+        scorer=fuzz.WRatio
+    )
+
+    if score > 80: # A high score (e.g., >80) indicates a good match
+        matched_row = pack.df.loc[index]
+        return matched_row[short_col], matched_row[detailed_col], score
+    return None, None, score
+
+
 submitted = st.button("Get Answer")
 
 if submitted and st.session_state['user_question']:
     with st.spinner("Searching for your answer..."):
-        queries = df[col_name].dropna().tolist()
-        
-        # Use fuzzy matching with a threshold
-        best_match, score, index = process.extractOne(
-            st.session_state['user_question'], 
-            queries, 
-            scorer=fuzz.WRatio
-        )
-
-        if score > 80: # A high score (e.g., >80) indicates a good match
-            matched_row = df[df[col_name] == best_match]
-            short_answer = matched_row.iloc[0][short_col]
-            detailed_answer = matched_row.iloc[0][detailed_col]
-            st.success(f"Found a match with a similarity score of {score:.2f}%.")
-        else:
-            short_answer = "❌ Sorry, we couldn't find a close answer. Try rephrasing or select another language."
-            detailed_answer = short_answer
-            st.warning("No close match found. The AI could not find a similar query in the dataset.")
-            
-        st.markdown(f"**Short Answer:**\n{short_answer}")
-        st.markdown(f"**Detailed Answer:**\n{detailed_answer}")
-
-        # -------------------------------
-        # Text-to-Speech
-        # -------------------------------
         try:
-            if selected_lang in ["English", "Hindi"]:
-                lang_code = "hi" if selected_lang == "Hindi" else "en"
-                tts = gTTS(text=short_answer, lang=lang_code)
-                
-                # Save the audio to a BytesIO object instead of a temporary file
-                audio_buffer = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-                tts.save(audio_buffer.name)
-                
-                st.audio(audio_buffer.name)
-                audio_buffer.close()
-                os.unlink(audio_buffer.name)
-        except Exception as e:
-            st.warning(f"Audio playback not available: {e}")
+            short_answer, detailed_answer, score = match_question(st.session_state['user_question'], selected_pack, selected_lang)
+        except PackNotFound:
+            short_answer, detailed_answer, score = None, None, 0
+    st.session_state['answer'] = {
+        "question": st.session_state['user_question'],
+        "lang": selected_lang,
+        "pack": selected_pack,
+        "short": short_answer,
+        "detailed": detailed_answer,
+        "score": score,
+    }
+    st.session_state.pop('answer_audio', None)
+
+
+@st.fragment
+def answer_panel(answer):
+    if answer['short'] is not None:
+        st.success(f"Found a match with a similarity score of {answer['score']:.2f}%.")
+        short_answer, detailed_answer = answer['short'], answer['detailed']
+    else:
+        short_answer = "❌ Sorry, we couldn't find a close answer. Try rephrasing or select another language."
+        detailed_answer = short_answer
+        st.warning("No close match found. The AI could not find a similar query in the dataset.")
+
+    st.markdown(f"**Short Answer:**\n{short_answer}")
+    st.markdown(f"**Detailed Answer:**\n{detailed_answer}")
+
+
+# -------------------------------
+# Text-to-Speech
+# -------------------------------
+@st.fragment
+def audio_panel(answer):
+    if answer['short'] is None or answer['lang'] not in ["English", "Hindi"]:
+        return
+    try:
+        if 'answer_audio' not in st.session_state:
+            lang_code = "hi" if answer['lang'] == "Hindi" else "en"
+            st.session_state['answer_audio'] = answer_audio(answer['short'], lang_code)
+        audio_bytes, audio_mime = st.session_state['answer_audio']
+        st.audio(audio_bytes, format=audio_mime)
+    except Exception as e:
+        st.warning(f"Audio playback not available: {e}")
+
 
 # -------------------------------
 # Feedback
 # -------------------------------
-if st.session_state['user_question'] and submitted:
+@st.fragment
+def feedback_panel(answer):
     st.markdown("---")
     st.markdown("### Was this helpful?")
     col1, col2 = st.columns([1,1])
@@ -187,6 +220,13 @@ if st.session_state['user_question'] and submitted:
         if st.button("👎 No", key="downvote"):
             st.warning("We'll try to improve the accuracy of our answers.")
 
+
+answer = st.session_state.get('answer')
+if answer and answer['lang'] == selected_lang and answer['pack'] == selected_pack:
+    answer_panel(answer)
+    audio_panel(answer)
+    feedback_panel(answer)
+
 # -------------------------------
 # Consult a Lawyer message
 # -------------------------------
@@ -204,30 +244,24 @@ get_ipython().system('pip install streamlit pandas gTTS SpeechRecognition rapidf
 
 
 import streamlit as st
-import pandas as pd
-from gtts import gTTS
-import tempfile
-import os
 import speech_recognition as sr
-from rapidfuzz import process, fuzz
+from rapidfuzz import fuzz
+from audio_delivery import answer_audio
+from dataset_index import match
+from knowledge_packs import KnowledgePackRegistry, PackNotFound
 
 # Set up page configuration for a wider layout
 st.set_page_config(layout="wide")
 
 # -------------------------------
-# Load Dataset
+# Knowledge Packs
 # -------------------------------
-@st.cache_data
-def load_data():
-    """Loads the dataset from an Excel file and caches it."""
-    try:
-        df = pd.read_excel("SIH_Dataset_Final.xlsx")
-        return df
-    except FileNotFoundError:
-        st.error("Error: 'SIH_Dataset_Final.xlsx' not found. Please ensure the file is in the same directory.")
-        st.stop()
+@st.cache_resource
+def load_registry():
+    """Shared across sessions; each (pack, language) pair is loaded on first use (see knowledge_packs.py)."""
+    return KnowledgePackRegistry()
 
-df = load_data()
+registry = load_registry()
 
 # -------------------------------
 # Language mapping
@@ -258,17 +292,24 @@ st.markdown("---")
 with st.sidebar:
     st.header("Settings")
     selected_lang = st.selectbox("Select language:", list(language_map.keys()))
+    selected_pack = st.selectbox("Knowledge pack:", registry.available())
     st.info("Your feedback helps us improve!")
 
 # Map selected language to column names
 col_name = f"Query_{language_map[selected_lang]}"
-short_col = f"Short_{language_map[selected_lang]}"
-detailed_col = f"Detailed_{language_map[selected_lang]}"
 
-# Check if required columns exist in the dataframe
-if col_name not in df.columns or short_col not in df.columns or detailed_col not in df.columns:
-    st.error(f"Error: Required columns for '{selected_lang}' language are not present in the dataset.")
+# Load only the selected pack and language; returns None if the workbook or its columns are missing
+pack = registry.get(selected_pack, language_map[selected_lang])
+if pack is None:
+    st.error(f"Error: The '{selected_pack}' knowledge pack is missing or has no data for '{selected_lang}'.")
     st.stop()
+df = pack.df
+
+with st.sidebar:
+    with st.expander("Loaded knowledge packs"):
+        for name, lang, size in registry.resident():
+            st.caption(f"{name} / {lang}: {size / 1024 / 1024:.1f} MB")
+        st.caption(f"Total: {registry.resident_bytes() / 1024 / 1024:.1f} of {registry.budget / 1024 / 1024:.0f} MB")
 
 # -------------------------------
 # Main Content Area
@@ -279,103 +320,135 @@ st.markdown("---")
 # -------------------------------
 # Example Queries
 # -------------------------------
+def set_question(question):
+    """Button callback: sets the question before the rerun, so no extra st.rerun() is needed."""
+    st.session_state['user_question'] = question
+    st.session_state['user_question_input'] = question
+
+
 st.markdown("**Try one of these example questions:**")
 example_queries = df[col_name].dropna().tolist()[:3]
 cols = st.columns(len(example_queries))
 for i, query in enumerate(example_queries):
     with cols[i]:
-        if st.button(query):
-            st.session_state['user_question'] = query
-            st.rerun()
+        st.button(query, on_click=set_question, args=(query,))
 
 # -------------------------------
 # User Input & Speech Recognition
 # -------------------------------
-user_input_col, speech_col = st.columns([4, 1])
-
-with user_input_col:
-    user_question = st.text_input("Enter your question:", value=st.session_state['user_question'], key='user_question_input')
-
-with speech_col:
-    st.markdown("<br>", unsafe_allow_html=True) # Add some spacing
-    if st.button("🎙️ Speak"):
-        st.session_state['is_listening'] = True
-
-if st.session_state.get('is_listening'):
+def listen():
+    """Button callback: records a question from the microphone before the rerun."""
     r = sr.Recognizer()
     try:
         with st.spinner("Listening... Please speak clearly."):
             with sr.Microphone() as source:
                 r.adjust_for_ambient_noise(source)
                 audio = r.listen(source, timeout=5, phrase_time_limit=5)
-            
-            lang_code = "hi-IN" if selected_lang == "Hindi" else "en-IN"
-            user_question_speech = r.recognize_google(audio, language=lang_code)
-            st.session_state['user_question'] = user_question_speech
-            st.session_state['is_listening'] = False
-            st.rerun()
-            
+
+        lang_code = "hi-IN" if selected_lang == "Hindi" else "en-IN"
+        set_question(r.recognize_google(audio, language=lang_code))
     except sr.UnknownValueError:
-        st.warning("Sorry, I could not understand the audio. Please try again.")
-        st.session_state['is_listening'] = False
+        st.session_state['speech_error'] = ("warning", "Sorry, I could not understand the audio. Please try again.")
     except sr.RequestError as e:
-        st.error(f"Could not request results from the speech recognition service; {e}")
-        st.session_state['is_listening'] = False
+        st.session_state['speech_error'] = ("error", f"Could not request results from the speech recognition service; {e}")
     except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
-        st.session_state['is_listening'] = False
+        st.session_state['speech_error'] = ("error", f"An unexpected error occurred: {e}")
+
+
+user_input_col, speech_col = st.columns([4, 1])
+
+with user_input_col:
+    user_question = st.text_input("Enter your question:", key='user_question_input')
+    st.session_state['user_question'] = user_question
+
+with speech_col:
+    st.markdown("<br>", unsafe_allow_html=True) # Add some spacing
+    st.button("🎙️ Speak", on_click=listen)
+
+if 'speech_error' in st.session_state:
+    level, message = st.session_state.pop('speech_error')
+    getattr(st, level)(message)
 
 # -------------------------------
 # Fetch Answer
 # -------------------------------
+# The match is cached and stored in session state; the answer, audio and
+# feedback panels are fragments, so clicking inside one reruns only that panel.
+@st.cache_data(show_spinner=False)
+def match_question(question, pack_name, lang):
+    short_col, detailed_col = f"Short_{language_map[lang]}", f"Detailed_{language_map[lang]}"
+    pack = registry.get(pack_name, language_map[lang])
+    if pack is None:  # workbook removed since the page was rendered; raise so the miss isn't cached
+        raise PackNotFound(pack_name, lang)
+
+    # Use fuzzy matching with a threshold, scoring cluster representatives first
+    best_match, score, index = match(
+        pack.index,
+        question,
+        scorer=fuzz.WRatio
+    )
+
+    if score > 80: # A high score (e.g., >80) indicates a good match
+        matched_row = pack.df.loc[index]
+        return matched_row[short_col], matched_row[detailed_col], score
+    return None, None, score
+
+
 submitted = st.button("Get Answer")
 
 if submitted and st.session_state['user_question']:
     with st.spinner("Searching for your answer..."):
-        queries = df[col_name].dropna().tolist()
-        
-        # Use fuzzy matching with a threshold
-        best_match, score, index = process.extractOne(
-            st.session_state['user_question'], 
-            queries, 
-            scorer=fuzz.WRatio
-        )
-
-        if score > 80: # A high score (e.g., >80) indicates a good match
-            matched_row = df[df[col_name] == best_match]
-            short_answer = matched_row.iloc[0][short_col]
-            detailed_answer = matched_row.iloc[0][detailed_col]
-            st.success(f"Found a match with a similarity score of {score:.2f}%.")
-        else:
-            short_answer = "❌ Sorry, we couldn't find a close answer. Try rephrasing or select another language."
-            detailed_answer = short_answer
-            st.warning("No close match found. The AI could not find a similar query in the dataset.")
-            
-        st.markdown(f"**Short Answer:**\n{short_answer}")
-        st.markdown(f"**Detailed Answer:**\n{detailed_answer}")
-
-        # -------------------------------
-        # Text-to-Speech
-        # -------------------------------
         try:
-            if selected_lang in ["English", "Hindi"]:
-                lang_code = "hi" if selected_lang == "Hindi" else "en"
-                tts = gTTS(text=short_answer, lang=lang_code)
-                
-                # Save the audio to a BytesIO object instead of a temporary file
-                audio_buffer = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-                tts.save(audio_buffer.name)
-                
-                st.audio(audio_buffer.name)
-                audio_buffer.close()
-                os.unlink(audio_buffer.name)
-        except Exception as e:
-            st.warning(f"Audio playback not available: {e}")
+            short_answer, detailed_answer, score = match_question(st.session_state['user_question'], selected_pack, selected_lang)
+        except PackNotFound:
+            short_answer, detailed_answer, score = None, None, 0
+    st.session_state['answer'] = {
+        "question": st.session_state['user_question'],
+        "lang": selected_lang,
+        "pack": selected_pack,
+        "short": short_answer,
+        "detailed": detailed_answer,
+        "score": score,
+    }
+    st.session_state.pop('answer_audio', None)
+
+
+@st.fragment
+def answer_panel(answer):
+    if answer['short'] is not None:
+        st.success(f"Found a match with a similarity score of {answer['score']:.2f}%.")
+        short_answer, detailed_answer = answer['short'], answer['detailed']
+    else:
+        short_answer = "❌ Sorry, we couldn't find a close answer. Try rephrasing or select another language."
+        detailed_answer = short_answer
+        st.warning("No close match found. The AI could not find a similar query in the dataset.")
+
+    st.markdown(f"**Short Answer:**\n{short_answer}")
+    st.markdown(f"**Detailed Answer:**\n{detailed_answer}")
+
+
+# -------------------------------
+# Text-to-Speech
+# -------------------------------
+@st.fragment
+def audio_panel(answer):
+    if answer['short'] is None or answer['lang'] not in ["English", "Hindi"]:
+        return
+    try:
+        if 'answer_audio' not in st.session_state:
+            lang_code = "hi" if answer['lang'] == "Hindi" else "en"
+            st.session_state['answer_audio'] = answer_audio(answer['short'], lang_code)
+        audio_bytes, audio_mime = st.session_state['answer_audio']
+        st.audio(audio_bytes, format=audio_mime)
+    except Exception as e:
+        st.warning(f"Audio playback not available: {e}")
+
 
 # -------------------------------
 # Feedback
 # -------------------------------
-if st.session_state['user_question'] and submitted:
+@st.fragment
+def feedback_panel(answer):
     st.markdown("---")
     st.markdown("### Was this helpful?")
     col1, col2 = st.columns([1,1])
@@ -386,6 +459,13 @@ if st.session_state['user_question'] and submitted:
         if st.button("👎 No", key="downvote"):
             st.warning("We'll try to improve the accuracy of our answers.")
 
+
+answer = st.session_state.get('answer')
+if answer and answer['lang'] == selected_lang and answer['pack'] == selected_pack:
+    answer_panel(answer)
+    audio_panel(answer)
+    feedback_panel(answer)
+
 # -------------------------------
 # Consult a Lawyer message
 # -------------------------------
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import knowledge_packs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTION = "How can I file for divorce?"
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    """Runs app1.py from a scratch copy of the dataset plus a small labour pack."""
+    shutil.copy(os.path.join(ROOT, "SIH_Dataset_Final.xlsx"), tmp_path)
+    (tmp_path / "packs").mkdir()
+    pd.DataFrame({
+        "Query_English": ["Can my employer withhold my salary?"],
+        "Short_English": ["No, wages must be paid on time."],
+        "Detailed_English": ["The Payment of Wages Act requires timely payment."],
+    }).to_excel(tmp_path / "packs" / "labour.xlsx", index=False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def resident(at):
+    return [line.value for line in at.caption if "/" in line.value]
+
+
+def submit(at, question):
+    at.text_input(key="user_question").input(question)
+    next(b for b in at.button if b.label == "🔍 Get Answer").click().run()
+    assert not at.exception
+    return at.session_state["answer"]
+
+
+def test_app1_loads_only_the_selected_pack_and_language(app_dir):
+    at = AppTest.from_file(os.path.join(ROOT, "app1.py"), default_timeout=30).run()
+    assert not at.exception
+    assert at.selectbox[1].label == "📚 Knowledge pack:"
+    assert at.selectbox[1].options == ["core", "labour"]
+    assert [c.split(":")[0] for c in resident(at)] == ["core / English"]
+
+    at.selectbox[0].set_value("Hindi").run()
+    assert [c.split(":")[0] for c in resident(at)] == ["core / English", "core / Hindi"]
+
+
+def test_app1_answers_from_the_selected_pack(app_dir):
+    at = AppTest.from_file(os.path.join(ROOT, "app1.py"), default_timeout=30).run()
+    at.selectbox[1].set_value("labour").run()
+    answer = submit(at, "Can my employer withhold my salary?")
+    assert answer["pack"] == "labour"
+    assert answer["short"] == "No, wages must be paid on time."
+
+    # The labour pack has no Hindi columns
+    at.selectbox[0].set_value("Hindi").run()
+    assert not at.exception
+    assert submit(at, "वेतन")["short"] == "⚠️ Dataset for this language not available."
+
+
+def test_app1_does_not_cache_a_missing_pack(app_dir, monkeypatch):
+    get = knowledge_packs.KnowledgePackRegistry.get
+    missing = {"match_question": 1}
+
+    def flaky_get(self, pack, lang):
+        # The workbook vanishes once, between rendering the page and matching
+        caller = sys._getframe(1).f_code.co_name
+        if missing.get(caller):
+            missing[caller] -= 1
+            return None
+        return get(self, pack, lang)
+
+    monkeypatch.setattr(knowledge_packs.KnowledgePackRegistry, "get", flaky_get)
+    at = AppTest.from_file(os.path.join(ROOT, "app1.py"), default_timeout=30).run()
+    assert submit(at, QUESTION)["short"] == "⚠️ Dataset for this language not available."
+    assert submit(at, QUESTION)["short"] != "⚠️ Dataset for this language not available."
@@ -0,0 +1,117 @@
+import subprocess
+
+import pytest
+
+import audio_delivery
+
+MP3 = b"\xff\xfb" + b"\x00" * 1000
+
+IPHONE_SAFARI = ("Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 "
+                 "(KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1")
+IPHONE_CHROME = ("Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 "
+                 "(KHTML, like Gecko) CriOS/118.0.5993.69 Mobile/15E148 Safari/604.1")
+IPAD_FIREFOX = ("Mozilla/5.0 (iPad; CPU OS 16_0 like Mac OS X) AppleWebKit/605.1.15 "
+                "(KHTML, like Gecko) FxiOS/118.0 Mobile/15E148 Safari/605.1.15")
+MAC_SAFARI = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+              "(KHTML, like Gecko) Version/16.0 Safari/605.1.15")
+ANDROID_CHROME = ("Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/118.0.0.0 Mobile Safari/537.36")
+DESKTOP_CHROME = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36")
+DESKTOP_FIREFOX = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:118.0) Gecko/20100101 Firefox/118.0"
+
+
+@pytest.mark.parametrize("user_agent, expected", [
+    (IPHONE_SAFARI, "mp3_speech"),
+    (IPHONE_CHROME, "mp3_speech"),
+    (IPAD_FIREFOX, "mp3_speech"),
+    (MAC_SAFARI, "mp3_speech"),
+    (ANDROID_CHROME, "opus"),
+    (DESKTOP_CHROME, "opus"),
+    (DESKTOP_FIREFOX, "opus"),
+    ("", "opus"),
+])
+def test_pick_format(user_agent, expected):
+    assert audio_delivery.pick_format({"User-Agent": user_agent}) == expected
+
+
+class FakeTTS:
+    calls = []
+
+    def __init__(self, text, lang):
+        FakeTTS.calls.append((text, lang))
+
+    def write_to_fp(self, fp):
+        fp.write(MP3)
+
+
+@pytest.fixture
+def fake_tts(monkeypatch):
+    FakeTTS.calls = []
+    monkeypatch.setattr(audio_delivery, "gTTS", FakeTTS)
+    return FakeTTS
+
+
+def test_synthesize_runs_gtts_once_per_lang_and_text(fake_tts):
+    assert audio_delivery.synthesize("Namaste", "hi") == MP3
+    audio_delivery.synthesize("Namaste", "hi")
+    audio_delivery.synthesize("Namaste", "en")
+    audio_delivery.synthesize("Hello", "en")
+    audio_delivery.synthesize("Hello", "en")
+    assert fake_tts.calls == [("Namaste", "hi"), ("Namaste", "en"), ("Hello", "en")]
+
+
+def fake_ffmpeg(monkeypatch, run):
+    monkeypatch.setattr(audio_delivery.shutil, "which", lambda name: "/usr/bin/ffmpeg")
+    calls = []
+
+    def counting_run(*args, **kwargs):
+        calls.append(args)
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(audio_delivery.subprocess, "run", counting_run)
+    return calls
+
+
+def test_transcode_returns_compact_variant_and_caches_it(monkeypatch):
+    calls = fake_ffmpeg(monkeypatch, lambda *a, **kw: subprocess.CompletedProcess(a, 0, b"OggS", b""))
+    assert audio_delivery.transcode(MP3, "opus") == (b"OggS", "audio/ogg")
+    assert audio_delivery.transcode(MP3, "opus") == (b"OggS", "audio/ogg")
+    assert len(calls) == 1
+
+
+def test_transcode_falls_back_without_ffmpeg(monkeypatch):
+    monkeypatch.setattr(audio_delivery.shutil, "which", lambda name: None)
+    assert audio_delivery.transcode(MP3, "opus") == (MP3, "audio/mpeg")
+
+
+@pytest.mark.parametrize("run", [
+    lambda *a, **kw: subprocess.CompletedProcess(a, 1, b"", b"boom"),
+    lambda *a, **kw: subprocess.CompletedProcess(a, 0, b"", b""),
+    lambda *a, **kw: (_ for _ in ()).throw(subprocess.TimeoutExpired("ffmpeg", 30)),
+    lambda *a, **kw: (_ for _ in ()).throw(OSError("exec failed")),
+])
+def test_transcode_falls_back_when_encode_fails(monkeypatch, run):
+    fake_ffmpeg(monkeypatch, run)
+    assert audio_delivery.transcode(MP3, "opus") == (MP3, "audio/mpeg")
+
+
+def test_transcode_falls_back_when_output_is_larger(monkeypatch):
+    fake_ffmpeg(monkeypatch, lambda *a, **kw: subprocess.CompletedProcess(a, 0, MP3 * 2, b""))
+    assert audio_delivery.transcode(MP3, "mp3_speech") == (MP3, "audio/mpeg")
+
+
+def test_transcode_failures_are_not_cached(monkeypatch):
+    fake_ffmpeg(monkeypatch, lambda *a, **kw: subprocess.CompletedProcess(a, 1, b"", b"boom"))
+    assert audio_delivery.transcode(MP3, "opus") == (MP3, "audio/mpeg")
+
+    calls = fake_ffmpeg(monkeypatch, lambda *a, **kw: subprocess.CompletedProcess(a, 0, b"OggS", b""))
+    assert audio_delivery.transcode(MP3, "opus") == (b"OggS", "audio/ogg")
+    assert len(calls) == 1
+
+
+def test_transcode_passes_mp3_through(monkeypatch):
+    calls = fake_ffmpeg(monkeypatch, lambda *a, **kw: subprocess.CompletedProcess(a, 0, b"x", b""))
+    assert audio_delivery.transcode(MP3, "mp3") == (MP3, "audio/mpeg")
+    assert audio_delivery.transcode(MP3, "flac") == (MP3, "audio/mpeg")
+    assert calls == []
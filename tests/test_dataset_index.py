@@ -0,0 +1,137 @@
+import os
+import pickle
+
+import pandas as pd
+import pytest
+from rapidfuzz import fuzz
+
+import dataset_index
+
+DIVORCE_SHORT = "File a petition in family court."
+DIVORCE_DETAILED = "Under the Hindu Marriage Act, a divorce petition is filed in the family court."
+
+
+def frame(rows, lang="English", index=None):
+    return pd.DataFrame(
+        [{f"Query_{lang}": q, f"Short_{lang}": s, f"Detailed_{lang}": d} for q, s, d in rows],
+        index=index,
+    )
+
+
+PARAPHRASES = frame([
+    ("How can I file for divorce?", DIVORCE_SHORT, DIVORCE_DETAILED),
+    ("How can I file for a divorce?", DIVORCE_SHORT, DIVORCE_DETAILED),
+    ("how can i file for divorce", DIVORCE_SHORT, DIVORCE_DETAILED),
+    ("How to register an FIR at the police station?", "Go to the police station.", "Section 154 CrPC ..."),
+], index=[10, 20, 30, 40])
+
+
+def test_paraphrases_with_same_answers_merge():
+    lang_index = dataset_index.compile_language(PARAPHRASES, "English")
+    assert lang_index["questions"] == 4
+    assert len(lang_index["representatives"]) == 2
+    assert sorted(map(sorted, lang_index["clusters"])) == [[10, 20, 30], [40]]
+
+
+def test_near_duplicates_with_different_answers_never_merge():
+    df = frame([
+        ("How can I file for divorce?", DIVORCE_SHORT, DIVORCE_DETAILED),
+        ("How can I file for a divorce?", "Different short answer.", DIVORCE_DETAILED),
+        ("how can i file for divorce", DIVORCE_SHORT, "Different detailed answer."),
+    ])
+    lang_index = dataset_index.compile_language(df, "English")
+    assert len(lang_index["representatives"]) == 3
+
+
+def test_compile_language_skips_missing_language_and_blank_questions():
+    assert dataset_index.compile_language(PARAPHRASES, "Hindi") is None
+
+    df = frame([("How can I file for divorce?", DIVORCE_SHORT, DIVORCE_DETAILED), (None, "x", "y")])
+    assert dataset_index.compile_language(df, "English")["questions"] == 1
+
+
+def test_match_returns_row_label_not_position():
+    lang_index = dataset_index.compile_language(PARAPHRASES, "English")
+    question, score, label = dataset_index.match(lang_index, "How to register an FIR at the police station?",
+                                                 scorer=fuzz.WRatio)
+    assert label == 40
+    assert score == 100
+    assert PARAPHRASES.loc[label, "Short_English"] == "Go to the police station."
+
+    # The best variant inside the winning cluster is returned, not just its representative
+    question, score, label = dataset_index.match(lang_index, "HOW CAN I FILE FOR A DIVORCE?", processor=str.lower)
+    assert (question, score, label) == ("How can I file for a divorce?", 100, 20)
+
+
+@pytest.mark.parametrize("lang_index", [None, {"representatives": [], "clusters": [], "variants": [], "questions": 0}])
+def test_match_on_empty_index(lang_index):
+    assert dataset_index.match(lang_index, "anything") == (None, 0, None)
+
+
+def test_index_report():
+    index = {
+        "English": {"representatives": ["a"] * 3, "clusters": [], "variants": [], "questions": 4},
+        "Hindi": {"representatives": [], "clusters": [], "variants": [], "questions": 0},
+        "Tamil": None,
+    }
+    assert dataset_index.index_report(index).splitlines() == [
+        "English: 4 questions -> 3 clusters (25.0% smaller)",
+        "Hindi: 0 questions -> 0 clusters (0.0% smaller)",
+        "Tamil: not in dataset",
+    ]
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "dataset.xlsx")
+    PARAPHRASES.to_excel(path)
+    return path
+
+
+def test_load_index_reuses_fresh_pickle(workbook, monkeypatch):
+    first = dataset_index.load_index(workbook, PARAPHRASES)
+    assert os.path.exists(dataset_index.index_path(workbook))
+
+    monkeypatch.setattr(dataset_index, "compile_dataset", lambda df: pytest.fail("recompiled"))
+    assert dataset_index.load_index(workbook, PARAPHRASES) == first
+
+
+def test_load_index_recompiles_when_parameters_change(workbook, monkeypatch):
+    dataset_index.load_index(workbook, PARAPHRASES)
+    monkeypatch.setattr(dataset_index, "SIMILARITY", 0.99)
+    compiled = []
+    monkeypatch.setattr(dataset_index, "compile_dataset", lambda df: compiled.append(df) or {})
+    dataset_index.load_index(workbook, PARAPHRASES)
+    assert len(compiled) == 1
+
+
+def test_load_index_recompiles_unversioned_or_stale_pickle(workbook, monkeypatch):
+    compiled = []
+    monkeypatch.setattr(dataset_index, "compile_dataset", lambda df: compiled.append(df) or {})
+
+    # Pickle written by the first version of this module: a bare {lang: index} dict
+    with open(dataset_index.index_path(workbook), "wb") as file:
+        pickle.dump({"English": None}, file)
+    dataset_index.load_index(workbook, PARAPHRASES)
+
+    # Workbook edited after the index was compiled
+    os.utime(workbook, (os.path.getmtime(workbook) + 10,) * 2)
+    dataset_index.load_index(workbook, PARAPHRASES)
+    assert len(compiled) == 2
+
+
+def test_save_index_replaces_file_atomically(workbook, monkeypatch):
+    path = dataset_index.index_path(workbook)
+    dataset_index.save_index(path, {"English": None})
+
+    def interrupted_dump(obj, file):
+        file.write(b"half a pickle")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(dataset_index.pickle, "dump", interrupted_dump)
+    with pytest.raises(KeyboardInterrupt):
+        dataset_index.save_index(path, {"English": "new"})
+    monkeypatch.undo()
+
+    assert dataset_index.read_index(path, workbook) == {"English": None}
+    assert sorted(os.listdir(os.path.dirname(path))) == ["dataset.index.pkl", "dataset.xlsx"]
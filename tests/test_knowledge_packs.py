@@ -0,0 +1,132 @@
+import os
+
+import pandas as pd
+import pytest
+
+import dataset_index
+import knowledge_packs
+from knowledge_packs import KnowledgePackRegistry
+
+LANGUAGES = ["English", "Hindi"]
+
+
+def write_pack(path, prefix, languages=LANGUAGES):
+    rows = {}
+    for lang in languages:
+        rows[f"Query_{lang}"] = [f"{prefix} question {i} in {lang}" for i in range(20)]
+        rows[f"Short_{lang}"] = [f"{prefix} short answer {i}" for i in range(20)]
+        rows[f"Detailed_{lang}"] = [f"{prefix} detailed answer {i}" for i in range(20)]
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def packs(tmp_path):
+    return {
+        "core": write_pack(tmp_path / "core.xlsx", "core"),
+        "labour": write_pack(tmp_path / "labour.xlsx", "labour"),
+        "tenancy": write_pack(tmp_path / "tenancy.xlsx", "tenancy", languages=["English"]),
+    }
+
+
+@pytest.fixture
+def pack_size(packs):
+    """Resident size of one (pack, language) pair; the fixture packs are all the same shape."""
+    return KnowledgePackRegistry(packs, budget_mb=100).get("core", "English").size
+
+
+def budget_for(packs_count, pack_size):
+    return (packs_count + 0.5) * pack_size / 1024 / 1024
+
+
+def test_packs_load_lazily_on_first_get(packs, monkeypatch):
+    loads = []
+    read_excel = pd.read_excel
+    monkeypatch.setattr(knowledge_packs.pd, "read_excel",
+                        lambda path, **kwargs: loads.append(path) or read_excel(path, **kwargs))
+
+    registry = KnowledgePackRegistry(packs, budget_mb=100)
+    assert registry.resident() == []
+    assert loads == []
+
+    pack = registry.get("labour", "Hindi")
+    assert list(pack.df.columns) == ["Query_Hindi", "Short_Hindi", "Detailed_Hindi"]
+    assert pack.index["questions"] == 20
+    assert registry.get("labour", "Hindi") is pack
+    assert loads == [packs["labour"]]
+
+
+def test_get_hits_move_packs_to_most_recently_used(packs):
+    registry = KnowledgePackRegistry(packs, budget_mb=100)
+    registry.get("core", "English")
+    registry.get("labour", "English")
+    registry.get("core", "Hindi")
+    registry.get("core", "English")
+    assert [(p, l) for p, l, _ in registry.resident()] == [
+        ("labour", "English"), ("core", "Hindi"), ("core", "English"),
+    ]
+
+
+def test_least_recently_used_packs_are_evicted_over_budget(packs, pack_size):
+    registry = KnowledgePackRegistry(packs, budget_mb=budget_for(2, pack_size))
+    registry.get("core", "English")
+    registry.get("labour", "English")
+    registry.get("core", "English")
+    registry.get("core", "Hindi")
+    assert [(p, l) for p, l, _ in registry.resident()] == [("core", "English"), ("core", "Hindi")]
+    assert registry.resident_bytes() <= registry.budget
+
+
+def test_requested_pack_stays_even_if_it_alone_exceeds_budget(packs, pack_size):
+    registry = KnowledgePackRegistry(packs, budget_mb=budget_for(0, pack_size))
+    registry.get("core", "English")
+    pack = registry.get("labour", "English")
+    assert pack is not None
+    assert [(p, l) for p, l, _ in registry.resident()] == [("labour", "English")]
+
+
+def test_reloading_an_evicted_pack_does_not_recompile(packs, pack_size, monkeypatch):
+    registry = KnowledgePackRegistry(packs, budget_mb=budget_for(1, pack_size))
+    first = registry.get("core", "English")
+    registry.get("labour", "English")
+    assert os.path.exists(dataset_index.index_path(packs["core"], "English"))
+
+    monkeypatch.setattr(dataset_index, "compile_language", lambda df, lang: pytest.fail("recompiled"))
+    again = registry.get("core", "English")
+    assert again is not first
+    assert again.index == first.index
+
+
+def test_missing_pack_or_language_returns_none(packs, tmp_path):
+    registry = KnowledgePackRegistry({**packs, "consumer": str(tmp_path / "consumer.xlsx")}, budget_mb=100)
+    assert registry.get("unknown", "English") is None
+    assert registry.get("consumer", "English") is None
+    assert registry.get("tenancy", "Hindi") is None
+    assert registry.get("core", "Klingon") is None
+    assert registry.resident() == []
+
+
+def test_resident_reports_sizes(packs):
+    registry = KnowledgePackRegistry(packs, budget_mb=100)
+    core = registry.get("core", "English")
+    tenancy = registry.get("tenancy", "English")
+    assert registry.resident() == [("core", "English", core.size), ("tenancy", "English", tenancy.size)]
+    assert core.size >= core.df.memory_usage(deep=True).sum() > 0
+    assert registry.resident_bytes() == core.size + tenancy.size
+
+
+@pytest.mark.parametrize("value, expected", [(None, 256), ("64", 64.0), ("0.5", 0.5)])
+def test_budget_from_env(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("NYAYASETU_PACK_BUDGET_MB", raising=False)
+    else:
+        monkeypatch.setenv("NYAYASETU_PACK_BUDGET_MB", value)
+    assert knowledge_packs.budget_from_env() == expected
+
+
+@pytest.mark.parametrize("value", ["lots", "", "-5", "0", "nan", "inf", "-inf"])
+def test_invalid_budget_falls_back_with_warning(monkeypatch, value):
+    monkeypatch.setenv("NYAYASETU_PACK_BUDGET_MB", value)
+    with pytest.warns(UserWarning, match="NYAYASETU_PACK_BUDGET_MB"):
+        registry = KnowledgePackRegistry({})
+    assert registry.budget == knowledge_packs.DEFAULT_BUDGET_MB * 1024 * 1024